@@ -1,15 +1,29 @@
 from __future__ import annotations
 
+import os
 import sys
-import subprocess
+import time
+import asyncio
 import shlex
+import shutil
+import tempfile
 import re
+import threading
+from collections import Counter, deque
+from functools import lru_cache, partial
+from itertools import chain, islice
 from pathlib import Path
-from typing import NamedTuple
+from typing import Iterable, NamedTuple
 from dataclasses import dataclass
+from enum import IntEnum
+from difflib import SequenceMatcher
+
+from markdown_it import MarkdownIt
 
 from textual.app import App, ComposeResult
 from textual.containers import Horizontal, Vertical, VerticalScroll
+from textual.timer import Timer
+from textual.worker import get_current_worker
 from textual.widgets import (
     Header,
     Footer,
@@ -22,344 +36,225 @@ from textual.widgets import (
     Static,
     Input,
 )
+from textual.widgets.tree import TreeNode
+
+
+# Shell command keywords to highlight in the command output
+_SHELL_KEYWORDS = [
+    'mkdir', 'cd', 'touch', 'ls', 'rm', 'mv', 'cp', 'cat', 'echo',
+    'grep', 'find', 'chmod', 'chown', 'pwd', 'which', 'whereis',
+    'tar', 'zip', 'unzip', 'git', 'python', 'python3', 'node',
+    'npm', 'pip', 'pip3', 'export', 'alias', 'source', 'exec',
+    'sudo', 'su', 'exit', 'clear', 'history', 'man', 'help'
+]
+
+# Keywords and output tags are matched in a single pass; compiled once at
+# import because _highlight_shell_keywords runs for every output line
+_SHELL_HIGHLIGHT_RE = re.compile(
+    r'(?P<keyword>\b(?:' + '|'.join(re.escape(kw) for kw in _SHELL_KEYWORDS) + r')\b)'
+    r'|(?P<prompt>\$\s+)'
+    r'|(?P<error>\[error\])'
+    r'|(?P<success>\[success\])'
+    r'|(?P<warning>\[warning\])'
+    r'|(?P<stderr>\[stderr\])'
+    r'|(?P<cwd>\[cwd:\s*[^\]]+\])'
+    r'|(?P<exit_code>\[exit code:\s*\d+\])',
+    re.IGNORECASE,
+)
 
-
-class MarkdownIDE(App):
-    """
-    Terminal-based Markdown editor/mini-IDE by Aryaneel Shivam.
-
-    Layout:
-    - Header
-    - Status bar
-    - Main area:
-        - Left: File explorer + Command terminal
-        - Right: Tabbed editor (TextArea + Markdown preview)
-    - Footer (shows keybindings)
-    """
-
-    TITLE = "Shebang Markdown"
-
-    CSS = """
-    Screen {
-        layout: vertical;
-    }
-
-    #status-bar {
-        height: 1;
-        padding: 0 1;
-        background: $surface;
-        text-style: bold;
-    }
-
-    #main {
-        layout: horizontal;
-        height: 1fr;
-    }
-
-    #sidebar {
-        width: 30%;
-        border: round $accent;
-    }
-
-    #explorer-title, #command-title {
-        padding: 0 1;
-        text-style: bold;
-    }
-
-    #file_tree {
-        height: 1fr;
-    }
-
-    /* File type highlighting - using Rich markup in labels */
-    /* .md files are cyan, .txt files are green via label markup */
-
-    #command-section {
-        height: 15;
-        border-top: heavy $primary;
-    }
-
-    #command-input {
-        height: 3;
-        border: round $accent;
-    }
-
-    #command-output-scroll {
-        height: 1fr;
-        border: round $secondary;
-    }
-
-    #command-output {
-        width: 1fr;
-    }
-
-    #editor-panel {
-        width: 1fr;
-        border: round $secondary;
-    }
-
-    #tabs {
-        height: 1fr;
-    }
-
-    .editor-layout {
-        layout: horizontal;
-        height: 1fr;
-    }
-
-    .editor-text {
-        width: 2fr;
-        border-right: round $accent;
-    }
-
-    VerticalScroll.preview {
-        width: 1fr;
-        height: 1fr;
-        padding: 1;
-    }
-
-    Markdown.preview {
-        width: 100%;
-    }
-
-    #lint-panel {
-        height: 8;
-        border-top: heavy $warning;
-    }
-
-    .lint-error {
-        color: $error;
-    }
-
-    .lint-warning {
-        color: $warning;
-    }
-
-    /* Theme: Dark (default) */
-    .theme-dark {
-        background: $background;
-    }
-
-    /* Theme: Light */
-    .theme-light {
-        background: #ffffff;
-    }
-    .theme-light #status-bar {
-        background: #f0f0f0;
-        color: #000000;
-    }
-    .theme-light #sidebar {
-        border: round #4a90e2;
-        background: #fafafa;
-    }
-    .theme-light #command-section {
-        border-top: heavy #4a90e2;
-    }
-    .theme-light #command-input {
-        border: round #4a90e2;
-        background: #ffffff;
-    }
-    .theme-light #command-output-scroll {
-        border: round #888888;
-        background: #ffffff;
-    }
-    .theme-light #editor-panel {
-        border: round #888888;
-        background: #ffffff;
-    }
-    .theme-light .editor-text {
-        border-right: round #4a90e2;
-        background: #ffffff;
-    }
-
-    /* Theme: Blue */
-    .theme-blue {
-        background: #1e3a5f;
-    }
-    .theme-blue #status-bar {
-        background: #2d4a6b;
-        color: #e0e8f0;
-    }
-    .theme-blue #sidebar {
-        border: round #5a9fd4;
-        background: #253d5a;
-    }
-    .theme-blue #command-section {
-        border-top: heavy #5a9fd4;
-    }
-    .theme-blue #command-input {
-        border: round #5a9fd4;
-        background: #2d4a6b;
-    }
-    .theme-blue #command-output-scroll {
-        border: round #4a7ba0;
-        background: #253d5a;
-    }
-    .theme-blue #editor-panel {
-        border: round #4a7ba0;
-        background: #253d5a;
-    }
-    .theme-blue .editor-text {
-        border-right: round #5a9fd4;
-        background: #1e3a5f;
-    }
-
-    /* Theme: Green */
-    .theme-green {
-        background: #1f3d2e;
-    }
-    .theme-green #status-bar {
-        background: #2d4f3d;
-        color: #d0e8d8;
-    }
-    .theme-green #sidebar {
-        border: round #5abf7f;
-        background: #253d2e;
-    }
-    .theme-green #command-section {
-        border-top: heavy #5abf7f;
-    }
-    .theme-green #command-input {
-        border: round #5abf7f;
-        background: #2d4f3d;
-    }
-    .theme-green #command-output-scroll {
-        border: round #4a9f6f;
-        background: #253d2e;
-    }
-    .theme-green #editor-panel {
-        border: round #4a9f6f;
-        background: #253d2e;
-    }
-    .theme-green .editor-text {
-        border-right: round #5abf7f;
-        background: #1f3d2e;
-    }
-
-    /* Theme: Purple */
-    .theme-purple {
-        background: #2d1f3d;
-    }
-    .theme-purple #status-bar {
-        background: #3d2f4d;
-        color: #e8d0f0;
-    }
-    .theme-purple #sidebar {
-        border: round #9f7fbf;
-        background: #2d253d;
-    }
-    .theme-purple #command-section {
-        border-top: heavy #9f7fbf;
-    }
-    .theme-purple #command-input {
-        border: round #9f7fbf;
-        background: #3d2f4d;
-    }
-    .theme-purple #command-output-scroll {
-        border: round #7f5f9f;
-        background: #2d253d;
-    }
-    .theme-purple #editor-panel {
-        border: round #7f5f9f;
-        background: #2d253d;
-    }
-    .theme-purple .editor-text {
-        border-right: round #9f7fbf;
-        background: #2d1f3d;
-    }
-
-    /* Theme: Orange */
-    .theme-orange {
-        background: #3d2f1f;
-    }
-    .theme-orange #status-bar {
-        background: #4d3f2f;
-        color: #f0e8d0;
-    }
-    .theme-orange #sidebar {
-        border: round #df9f5f;
-        background: #3d352f;
-    }
-    .theme-orange #command-section {
-        border-top: heavy #df9f5f;
-    }
-    .theme-orange #command-input {
-        border: round #df9f5f;
-        background: #4d3f2f;
-    }
-    .theme-orange #command-output-scroll {
-        border: round #bf7f4f;
-        background: #3d352f;
-    }
-    .theme-orange #editor-panel {
-        border: round #bf7f4f;
-        background: #3d352f;
-    }
-    .theme-orange .editor-text {
-        border-right: round #df9f5f;
-        background: #3d2f1f;
-    }
-    """
-
-    BINDINGS = [
-        ("ctrl+n", "new_file", "New file"),
-        ("ctrl+o", "open_from_tree", "Open selected file"),
-        ("ctrl+s", "save", "Save file"),
-        ("ctrl+w", "close_tab", "Close tab"),
-        ("ctrl+h", "show_markdown_reference", "Show Markdown reference"),
-        ("ctrl+l", "show_lint_issues", "Show lint issues"),
-        ("ctrl+q", "quit", "Quit"),
-        ("ctrl+enter", "execute_command", "Execute command"),
-    ]
-
-    def __init__(self, root_path: str | None = None) -> None:
-        super().__init__()
-        self.root_path = Path(root_path) if root_path else Path.cwd()
-        self.current_working_dir = self.root_path  # Track current directory for commands
-
-        # editor_id -> Path
-        self.editor_files: dict[str, Path] = {}
-        # editor_id -> modified flag
-        self.modified: dict[str, bool] = {}
+# Match group name -> Rich style
+_SHELL_HIGHLIGHT_STYLES = {
+    'keyword': 'cyan bold',
+    'prompt': 'yellow',
+    'error': 'red bold',
+    'success': 'green bold',
+    'warning': 'yellow bold',
+    'stderr': 'red',
+    'cwd': 'blue',
+    'exit_code': 'magenta',
+}
+
+
+def _highlight_match(match: re.Match) -> str:
+    style = _SHELL_HIGHLIGHT_STYLES[match.lastgroup]
+    return f'[{style}]{match.group(0)}[/{style}]'
+
+
+# Longest line whose highlighted form is memoized; longer lines are rare
+# and would pin large strings in the cache after the log drops them
+_HIGHLIGHT_CACHE_MAX_LENGTH = 512
+
+
+@lru_cache(maxsize=2048)
+def _highlight_short_line(text: str) -> str:
+    # Cached: prompts, status tags and repeated listings recur constantly
+    return _SHELL_HIGHLIGHT_RE.sub(_highlight_match, text)
+
+
+def _highlight_shell_output(text: str) -> str:
+    """Return text with shell keywords and output tags wrapped in Rich markup."""
+    if len(text) <= _HIGHLIGHT_CACHE_MAX_LENGTH:
+        return _highlight_short_line(text)
+    return _SHELL_HIGHLIGHT_RE.sub(_highlight_match, text)
+
+
+# Commands whose non-option arguments are the paths they create/remove
+_FILE_COMMANDS = {'mkdir', 'rmdir', 'touch', 'rm', 'mv', 'cp'}
+# Characters that make a command too complex to infer its targets
+_SHELL_METACHARACTERS = set(';&|<>`$(){}[]*?~')
+
+
+# Markdown lint patterns
+_LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)]*)\)')
+_IMAGE_RE = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)')
+_FENCE_RE = re.compile(r'^\s*```')
+_HEADER_RE = re.compile(r'^(#+)')
+
+
+class Severity(IntEnum):
+    """Severity of a lint issue."""
+    ERROR = 0
+    WARNING = 1
+
+
+class LintIssue(NamedTuple):
+    """A single lint issue found in a markdown document."""
+    type: Severity
+    line: int
+    message: str
+
+
+# Rules that only depend on the line itself:
+# (pattern, group that must not be blank, severity, message template)
+_LINT_RULES = [
+    (_LINK_RE, 2, Severity.ERROR, "Empty link URL at line {line}: {match}"),
+    (_IMAGE_RE, 1, Severity.WARNING, "Image without alt text at line {line} (accessibility issue)"),
+]
+
+
+@lru_cache(maxsize=4096)
+def _match_lint_rules(line: str) -> tuple[tuple[Severity, str, str], ...]:
+    """Return (severity, message template, matched text) for each rule the line breaks."""
+    # Cached by line content, so lines that merely moved are not re-scanned
+    return tuple(
+        (severity, template, match.group(0))
+        for pattern, group, severity, template in _LINT_RULES
+        for match in pattern.finditer(line)
+        if not match.group(group).strip()
+    )
+
+
+def _lint_line(lines: tuple[str, ...], index: int, in_code_block: bool) -> list[LintIssue]:
+    """Return the lint issues for lines[index], given the code block state before it."""
+    issues = []
+    line = lines[index]
+    i = index + 1  # 1-based line number
+    line_count = len(lines)
+    
+    # Code fences: check for blank line after the block
+    if _FENCE_RE.match(line):
+        if in_code_block and i < line_count:
+            next_line = lines[i]
+            if next_line and not next_line.strip() == "":
+                issues.append(LintIssue(
+                    Severity.WARNING,
+                    i + 1,
+                    f"Consider adding blank line after code block at line {i}",
+                ))
+        return issues
+    
+    # Content inside code blocks isn't markdown
+    if in_code_block:
+        return issues
+    
+    header = _HEADER_RE.match(line)
+    if header:
+        # Check for headers without blank line after
+        if i < line_count:
+            next_line = lines[i]
+            if next_line and not next_line.strip() == "" and not next_line.startswith('#'):
+                issues.append(LintIssue(
+                    Severity.WARNING,
+                    i + 1,
+                    f"Consider adding blank line after header at line {i}",
+                ))
         
-        # Linting: editor_id -> list of lint issues
-        self.lint_issues: dict[str, list] = {}
-
-    # ---------- Compose UI ----------
-
-    def compose(self) -> ComposeResult:
-        yield Header(show_clock=True)
-        yield Label("Ready", id="status-bar")
-
-        with Horizontal(id="main"):
-            # Sidebar: file explorer + command terminal
-            with Vertical(id="sidebar"):
-                yield Static("📁 Explorer", id="explorer-title")
-                self.file_tree = Tree(str(self.root_path), id="file_tree")
-                yield self.file_tree
-
-                yield Static("🛠️  Command Terminal", id="command-title")
-                with Vertical(id="command-section"):
-                    self.command_input = Input(
-                        placeholder="Enter shell command (e.g., mkdir test, touch file.md, ls -la)...",
-                        id="command-input"
-                    )
-                    yield self.command_input
-                    with VerticalScroll(id="command-output-scroll"):
-                        self.command_output = Static("", id="command-output", markup=True)
-                        yield self.command_output
-
-            # Editor + preview area with tabs
-            with Vertical(id="editor-panel"):
-                self.tabs = TabbedContent(id="tabs")
-                yield self.tabs
-
-        yield Footer()
+        # Check for inconsistent heading levels (skip first few lines)
+        level = len(header.group(1))
+        if level > 6 and i > 3:
+            issues.append(LintIssue(
+                Severity.ERROR,
+                i,
+                f"Invalid heading level {level} at line {i} (max is 6)",
+            ))
+    
+    # Check for broken links and images without alt text
+    for severity, template, matched in _match_lint_rules(line):
+        issues.append(LintIssue(
+            severity,
+            i,
+            template.format(line=i, match=matched),
+        ))
+    
+    # Check for table formatting issues
+    if '|' in line and not line.strip().startswith('|'):
+        # Table row that doesn't start with |
+        if i > 1 and '|' in lines[i - 2]:
+            issues.append(LintIssue(
+                Severity.WARNING,
+                i,
+                f"Table row at line {i} should start with |",
+            ))
+    
+    return issues
+
+
+def _lint_text(
+    text: str,
+    previous: tuple[tuple[str, ...], list[bool], list[list]] | None,
+    max_issues: int,
+) -> tuple[tuple[tuple[str, ...], list[bool], list[list]], list[LintIssue], Counter]:
+    """Lint markdown text, reusing per-line results from a previous run's cache entry.
+    
+    At most ``max_issues`` issues are returned, along with the number of issues
+    of each severity in the whole document.
+    """
+    lines = tuple(text.splitlines())
+    line_count = len(lines)
+    
+    # Reuse per-line results from the previous run where nothing they
+    # depend on changed: the line, its neighbours and the code block state
+    prev_lines, prev_states, prev_line_issues = previous or ((), [], [])
+    prev_count = len(prev_lines)
+    unchanged = [new == old for new, old in zip(lines, prev_lines)]
+    unchanged.extend([False] * (line_count - len(unchanged)))
+    
+    states = []
+    line_issues = []
+    in_code_block = False
+    for index, line in enumerate(lines):
+        states.append(in_code_block)
+        if (
+            unchanged[index]
+            and prev_states[index] == in_code_block
+            and (index == 0 or unchanged[index - 1])
+            and (unchanged[index + 1] if index + 1 < line_count else prev_count == line_count)
+        ):
+            line_issues.append(prev_line_issues[index])
+        else:
+            line_issues.append(_lint_line(lines, index, in_code_block))
+        if '```' in line and _FENCE_RE.match(line):
+            in_code_block = not in_code_block
+    
+    # Only the returned list is capped, which bounds what is stored and shown
+    # per editor; the cache entry keeps every line's issues so they can be reused
+    counts = Counter(issue.type for issue in chain.from_iterable(line_issues))
+    issues = list(islice(chain.from_iterable(line_issues), max_issues))
+    return (lines, states, line_issues), issues, counts
 
-    # ---------- Lifecycle ----------
 
-    def _create_markdown_reference_tab(self) -> None:
-        """Create a tab with Markdown syntax reference."""
-        markdown_cheat_sheet = r"""# Markdown Syntax Reference
+# Contents of the markdown reference tab (Ctrl+H)
+_MARKDOWN_CHEAT_SHEET = r"""# Markdown Syntax Reference
 
 ## Headers
 ```
@@ -573,64 +468,287 @@ $$
 *Tip: Use Ctrl+S to save your markdown files!*
 *Note: Mermaid diagrams and math render in the preview. Export to HTML/PDF for full rendering.*
 """
+
+# Parser used to split documents into top-level blocks for the preview
+_MARKDOWN_PARSER = MarkdownIt("gfm-like")
+_CARRIAGE_RETURN_RE = re.compile(r"\r\n?")
+_LINE_END_RE = re.compile(r"(?<=\n)")
+
+
+def _split_markdown_blocks(markdown: str) -> list[str]:
+    """Split markdown source into the source text of its top-level blocks."""
+    # Token line maps count "\n" only, after markdown-it's own newline
+    # normalization; str.splitlines() also breaks on \x0c, \u2028 and others
+    markdown = _CARRIAGE_RETURN_RE.sub("\n", markdown)
+    env: dict = {}
+    tokens = _MARKDOWN_PARSER.parse(markdown, env)
+    if env.get("references"):
+        # Reference-style links are resolved across the whole document
+        return [markdown]
+    lines = _LINE_END_RE.split(markdown)
+    return [
+        "".join(lines[token.map[0]:token.map[1]])
+        for token in tokens
+        if token.level == 0 and token.nesting >= 0 and token.map
+    ]
+
+
+class MarkdownPreview(Vertical):
+    """Markdown preview that only re-renders the top-level blocks that changed.
+    
+    Each block is its own Markdown widget, which makes edits cheap but the
+    first render of a long document slower than a single widget would be.
+    """
+
+    def __init__(self, markdown: str = "", *, classes: str | None = None) -> None:
+        super().__init__(classes=classes)
+        self._blocks = _split_markdown_blocks(markdown)
+
+    def compose(self) -> ComposeResult:
+        for block in self._blocks:
+            yield Markdown(block)
+
+    def update(self, markdown: str) -> None:
+        """Update the preview, rebuilding only the blocks whose source changed."""
+        blocks = _split_markdown_blocks(markdown)
+        widgets = list(self.children)
+        ordered: list[Markdown] = []
+        new_widgets: set[Markdown] = set()
+
+        matcher = SequenceMatcher(None, self._blocks, blocks, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            old_widgets = widgets[i1:i2]
+            if tag == "equal":
+                ordered.extend(old_widgets)
+                continue
+            new_blocks = blocks[j1:j2]
+            # Re-render changed blocks in place, then add or remove the rest
+            for widget, block in zip(old_widgets, new_blocks):
+                widget.update(block)
+                ordered.append(widget)
+            for widget in old_widgets[len(new_blocks):]:
+                widget.remove()
+            for block in new_blocks[len(old_widgets):]:
+                widget = Markdown(block)
+                new_widgets.add(widget)
+                ordered.append(widget)
+
+        # Mount new blocks in document order, each after its predecessor
+        previous = None
+        for widget in ordered:
+            if widget in new_widgets:
+                if previous is not None:
+                    self.mount(widget, after=previous)
+                elif self.children:
+                    self.mount(widget, before=0)
+                else:
+                    self.mount(widget)
+            previous = widget
+
+        self._blocks = blocks
+
+
+class MarkdownIDE(App):
+    """
+    Terminal-based Markdown editor/mini-IDE by Aryaneel Shivam.
+
+    Layout:
+    - Header
+    - Status bar
+    - Main area:
+        - Left: File explorer + Command terminal
+        - Right: Tabbed editor (TextArea + Markdown preview)
+    - Footer (shows keybindings)
+    """
+
+    TITLE = "Shebang Markdown"
+
+    CSS_PATH = "app.tcss"
+
+    # Maximum number of entries kept in the command output area
+    MAX_OUTPUT_LINES = 2000
+    # Bytes read from a command's output at a time; lines may be longer
+    COMMAND_READ_SIZE = 64 * 1024
+    # Longest command output line kept, in bytes; the rest is cut off
+    MAX_OUTPUT_LINE_BYTES = 16 * 1024
+    # Maximum number of lint issues kept per editor; the rest are only counted
+    MAX_LINT_ISSUES = 1000
+    # Seconds to wait after the last keystroke before re-rendering the preview
+    PREVIEW_DEBOUNCE = 0.25
+    # Longest a preview may lag behind continuous typing, in seconds
+    PREVIEW_MAX_DELAY = 1.0
+
+    BINDINGS = [
+        ("ctrl+n", "new_file", "New file"),
+        ("ctrl+o", "open_from_tree", "Open selected file"),
+        ("ctrl+s", "save", "Save file"),
+        ("ctrl+w", "close_tab", "Close tab"),
+        ("ctrl+h", "show_markdown_reference", "Show Markdown reference"),
+        ("ctrl+l", "show_lint_issues", "Show lint issues"),
+        ("ctrl+q", "quit", "Quit"),
+        ("ctrl+enter", "execute_command", "Execute command"),
+    ]
+
+    def __init__(self, root_path: str | None = None) -> None:
+        super().__init__()
+        self.root_path = Path(root_path) if root_path else Path.cwd()
+        # Resolved once; used for containment checks when changing directory
+        self._root_resolved = self.root_path.resolve()
+        self._root_str = str(self._root_resolved)
+        self.current_working_dir = self._root_resolved  # Track current directory for commands
+
+        # editor_id -> Path
+        self.editor_files: dict[str, Path] = {}
+        # editor_id -> id of the TabPane holding the editor
+        self.editor_panes: dict[str, str] = {}
+        # pane_id -> editor_id, to map tab activations back to editors
+        self._pane_editors: dict[str, str] = {}
+        # editor_id of the active tab; None when no editor tab is active
+        self._active_editor: str | None = None
+        # Path -> editor_id, for focusing already-open files
+        self._path_to_editor: dict[Path, str] = {}
+        # editor_id -> text seen by the last change event
+        self._last_text: dict[str, str] = {}
+        # editor_id -> modified flag
+        self.modified: dict[str, bool] = {}
         
+        # Number of tabs opened so far, for unique editor and pane ids
+        self._tab_counter = 0
+        # Number of untitled buffers created so far, for naming new ones
+        self._untitled_counter = 0
+        # editor_id -> tab title of a buffer that has not been saved yet
+        self._untitled_names: dict[str, str] = {}
+        
+        # Linting: editor_id -> list of lint issues
+        self.lint_issues: dict[str, list[LintIssue]] = {}
+
+        # Command output: highlighted lines, capped at MAX_OUTPUT_LINES
+        self._command_output_lines: deque[str] = deque(maxlen=self.MAX_OUTPUT_LINES)
+        self._command_output_dirty = False
+
+        # Saves run on worker threads; path -> number of the latest save request
+        self._save_generation: dict[Path, int] = {}
+        self._save_lock = threading.Lock()
+
+        # Whether the markdown reference tab is currently open
+        self._reference_pane_exists = False
+
+        # Resolved directory path -> its node in the file tree
+        self._dir_nodes: dict[Path, TreeNode] = {}
+
+        # Lint cache: editor_id -> (lines, code block state per line, issues per line)
+        self._lint_cache: dict[str, tuple[tuple[str, ...], list[bool], list[list]]] = {}
+        # editor_id -> number of the latest background lint; older results are dropped
+        self._lint_generation: dict[str, int] = {}
+        # editor_id -> issue count per severity, including issues beyond MAX_LINT_ISSUES
+        self._lint_counts: dict[str, Counter] = {}
+
+        # Pending debounced preview/lint updates: editor_id -> timer, and
+        # editor_id -> monotonic time of the first change not yet rendered
+        self._preview_timers: dict[str, Timer] = {}
+        self._preview_pending_since: dict[str, float] = {}
+        # editor_id -> the preview widget in the same tab
+        self._preview_by_editor: dict[str, MarkdownPreview] = {}
+
+    # ---------- Compose UI ----------
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)
+        yield Label("Ready", id="status-bar")
+
+        with Horizontal(id="main"):
+            # Sidebar: file explorer + command terminal
+            with Vertical(id="sidebar"):
+                yield Static("📁 Explorer", id="explorer-title")
+                self.file_tree = Tree(str(self.root_path), id="file_tree")
+                yield self.file_tree
+
+                yield Static("🛠️  Command Terminal", id="command-title")
+                with Vertical(id="command-section"):
+                    self.command_input = Input(
+                        placeholder="Enter shell command (e.g., mkdir test, touch file.md, ls -la)...",
+                        id="command-input"
+                    )
+                    yield self.command_input
+                    with VerticalScroll(id="command-output-scroll"):
+                        self.command_output = Static("", id="command-output", markup=True)
+                        yield self.command_output
+
+            # Editor + preview area with tabs
+            with Vertical(id="editor-panel"):
+                self.tabs = TabbedContent(id="tabs")
+                yield self.tabs
+
+        yield Footer()
+
+    # ---------- Lifecycle ----------
+
+    def _create_markdown_reference_tab(self) -> None:
+        """Create a tab with Markdown syntax reference."""
         # Create the reference tab
         reference_text = TextArea(
-            text=markdown_cheat_sheet,
+            text=_MARKDOWN_CHEAT_SHEET,
             id="markdown_reference_editor",
             language="markdown",
             read_only=True,
             classes="editor-text",
         )
-        reference_preview = Markdown(markdown_cheat_sheet, classes="preview")
+        reference_preview = MarkdownPreview(_MARKDOWN_CHEAT_SHEET, classes="preview")
         preview_scroll = VerticalScroll(reference_preview, classes="preview")
         
         reference_content = Horizontal(reference_text, preview_scroll, classes="editor-layout")
         reference_pane = TabPane("📖 Markdown Reference", reference_content, id="markdown_reference_pane")
         
-        # Add as the first tab
         self.tabs.add_pane(reference_pane)
-        # Don't set it as active by default - let user files be active
+        self._reference_pane_exists = True
+        # Lets close_current_tab find and clear anything keyed by this editor
+        self._pane_editors[reference_pane.id] = reference_text.id
 
     def on_mount(self) -> None:
         """Populate file tree and maybe open a default file."""
+        self._dir_nodes[self._root_resolved] = self.file_tree.root
         self._build_file_tree(self.root_path, self.file_tree.root)
         self.file_tree.root.expand()
         self._set_status("Markdown IDE ready. Ctrl+N: New file  Ctrl+O: Open from tree  Ctrl+H: Markdown reference.")
         self._append_command_output("Markdown IDE started. Use command terminal to run shell commands.")
-        
-        # Create markdown reference tab
-        self._create_markdown_reference_tab()
 
         # If user passed a file path on CLI, open it
         if len(sys.argv) > 1:
             initial = Path(sys.argv[1]).expanduser().resolve()
             if initial.is_file():
-                self.open_file(initial)
+                self.run_worker(self.open_file(initial), exclusive=False)
 
     # ---------- Helpers ----------
 
     def _build_file_tree(self, base: Path, node) -> None:
-        """Recursively build a simple file tree."""
+        """Build one level of the file tree; subdirectories are populated on expand."""
         try:
-            for entry in sorted(base.iterdir()):
-                if entry.name.startswith("."):
-                    continue  # skip dotfiles/dirs
+            # scandir entries carry the file type from readdir, so is_dir()
+            # doesn't need an extra stat for regular files and directories
+            with os.scandir(base) as it:
+                entries = sorted(
+                    (entry for entry in it if not entry.name.startswith(".")),  # skip dotfiles/dirs
+                    key=lambda entry: entry.name,
+                )
+            for entry in entries:
                 if entry.is_dir():
                     # Color directories/folders
                     child = node.add(f"[yellow bold]{entry.name}[/yellow bold]", expand=False)
-                    child.data = entry
-                    self._build_file_tree(entry, child)
+                    child.data = Path(entry.path)
+                    self._dir_nodes[child.data.resolve()] = child
+                    # Placeholder so the node is expandable; replaced in on_tree_node_expanded
+                    child.add_leaf("…", data=None)
                 else:
                     # Add file with extension-based styling
-                    child = node.add(entry.name)
-                    child.data = entry
-                    # Store extension for styling
-                    ext = entry.suffix.lower()
+                    ext = os.path.splitext(entry.name)[1].lower()
                     if ext == '.md':
-                        child.label = f"[cyan]{entry.name}[/cyan]"
+                        label = f"[cyan]{entry.name}[/cyan]"
                     elif ext == '.txt':
-                        child.label = f"[green]{entry.name}[/green]"
+                        label = f"[green]{entry.name}[/green]"
+                    else:
+                        label = entry.name
+                    child = node.add(label)
+                    child.data = Path(entry.path)
         except PermissionError:
             pass
 
@@ -638,203 +756,129 @@ $$
         """Refresh the file tree to show a newly created/saved file."""
         if not path.exists():
             return
+        self._refresh_file_tree_dirs([path.parent])
+
+    def _refresh_file_tree_dirs(self, directories: Iterable[Path]) -> None:
+        """Rebuild the tree nodes showing the given directories."""
+        # Map each directory to its nearest ancestor that has a node in the tree
+        targets: dict[Path, TreeNode] = {}
+        for directory in directories:
+            directory = directory.resolve()
+            while directory not in self._dir_nodes and directory != directory.parent:
+                directory = directory.parent
+            if directory in self._dir_nodes:
+                targets[directory] = self._dir_nodes[directory]
         
-        # Find the directory node that contains this file
-        target_dir = path.parent.resolve()
-        
-        # If the file is in the root directory, refresh root
-        if target_dir == self.root_path:
-            # Clear and rebuild root children
-            self.file_tree.root.remove_children()
-            self._build_file_tree(self.root_path, self.file_tree.root)
-            return
-        
-        # Otherwise, find the directory node in the tree
-        def find_dir_node(node, target: Path):
-            """Recursively find the node for a given directory path."""
-            if hasattr(node, 'data') and node.data == target:
-                return node
-            for child in node.children:
-                if hasattr(child, 'data') and isinstance(child.data, Path) and child.data.is_dir():
-                    result = find_dir_node(child, target)
-                    if result:
-                        return result
-            return None
-        
-        dir_node = find_dir_node(self.file_tree.root, target_dir)
-        if dir_node:
+        for target_dir, dir_node in targets.items():
+            # Rebuilding an ancestor already covers this directory
+            if any(parent in targets for parent in target_dir.parents):
+                continue
             # Clear children and rebuild this directory
-            dir_node.remove_children()
+            self._clear_dir_node(target_dir, dir_node)
             self._build_file_tree(target_dir, dir_node)
             # Expand to show the new file
             dir_node.expand()
 
+    def _paths_touched_by(self, command: str) -> list[Path] | None:
+        """Return the paths a simple file command operates on, or None if unknown."""
+        # Pipelines, redirections, globs and substitutions can touch anything
+        if any(char in _SHELL_METACHARACTERS for char in command):
+            return None
+        try:
+            tokens = shlex.split(command)
+        except ValueError:
+            return None
+        if not tokens or tokens[0] not in _FILE_COMMANDS:
+            return None
+        return [
+            self.current_working_dir / token
+            for token in tokens[1:]
+            if not token.startswith("-")
+        ]
+
+    def _clear_dir_node(self, dir_path: Path, node: TreeNode) -> None:
+        """Remove a directory node's children and drop them from the index."""
+        stale = [key for key in self._dir_nodes if dir_path in key.parents]
+        for key in stale:
+            del self._dir_nodes[key]
+        node.remove_children()
+
     def _set_status(self, text: str) -> None:
         status = self.query_one("#status-bar", Label)
         status.update(text)
 
     def _highlight_shell_keywords(self, text: str) -> str:
-        """Highlight shell keywords in the text using Rich markup."""
-        # Shell command keywords to highlight
-        keywords = [
-            'mkdir', 'cd', 'touch', 'ls', 'rm', 'mv', 'cp', 'cat', 'echo',
-            'grep', 'find', 'chmod', 'chown', 'pwd', 'which', 'whereis',
-            'tar', 'zip', 'unzip', 'git', 'python', 'python3', 'node',
-            'npm', 'pip', 'pip3', 'export', 'alias', 'source', 'exec',
-            'sudo', 'su', 'exit', 'clear', 'history', 'man', 'help'
-        ]
-        
-        # Create a pattern that matches whole words only
-        pattern = r'\b(' + '|'.join(re.escape(kw) for kw in keywords) + r')\b'
-        
-        # Replace keywords with highlighted version using Rich markup
-        # Using cyan color for keywords
-        highlighted = re.sub(
-            pattern,
-            lambda m: f'[cyan bold]{m.group(1)}[/cyan bold]',
-            text,
-            flags=re.IGNORECASE
-        )
-        
-        # Also highlight common patterns
-        # Highlight command prompts: $ 
-        highlighted = re.sub(r'(\$\s+)', r'[yellow]\1[/yellow]', highlighted)
-        # Highlight error tags: [error]
-        highlighted = re.sub(r'(\[error\])', r'[red bold]\1[/red bold]', highlighted)
-        # Highlight success tags: [success]
-        highlighted = re.sub(r'(\[success\])', r'[green bold]\1[/green bold]', highlighted)
-        # Highlight warning tags: [warning]
-        highlighted = re.sub(r'(\[warning\])', r'[yellow bold]\1[/yellow bold]', highlighted)
-        # Highlight stderr tags: [stderr]
-        highlighted = re.sub(r'(\[stderr\])', r'[red]\1[/red]', highlighted)
-        # Highlight cwd tags: [cwd:]
-        highlighted = re.sub(r'(\[cwd:\s*[^\]]+\])', r'[blue]\1[/blue]', highlighted)
-        # Highlight exit code tags: [exit code:]
-        highlighted = re.sub(r'(\[exit code:\s*\d+\])', r'[magenta]\1[/magenta]', highlighted)
-        
-        return highlighted
+        """Highlight shell keywords and output tags in the text using Rich markup."""
+        return _highlight_shell_output(text)
+
+    def _lint_markdown_in_background(self, editor_id: str, text: str) -> None:
+        """Lint markdown content on a worker thread and store the issues when done."""
+        generation = self._lint_generation.get(editor_id, 0) + 1
+        self._lint_generation[editor_id] = generation
+        previous = self._lint_cache.get(editor_id)
+
+        def lint() -> None:
+            cache_entry, issues, counts = _lint_text(text, previous, self.MAX_LINT_ISSUES)
+            if not get_current_worker().is_cancelled:
+                self.call_from_thread(
+                    self._apply_background_lint,
+                    editor_id, generation, cache_entry, issues, counts,
+                )
+
+        self.run_worker(lint, thread=True, exclusive=True, group=f"lint-{editor_id}")
+
+    def _apply_background_lint(
+        self, editor_id: str, generation: int, cache_entry: tuple, issues: list, counts: Counter
+    ) -> None:
+        """Store the result of a background lint unless it is out of date."""
+        # Drop results superseded by a newer lint, or for a tab that was closed
+        if self._lint_generation.get(editor_id) != generation:
+            return
+        self._store_lint_result(editor_id, cache_entry, issues, counts)
 
-    def _lint_markdown(self, editor_id: str, text: str) -> None:
-        """Lint markdown content and store issues."""
-        issues = []
-        lines = text.split('\n')
-        
-        # Check for common markdown issues
-        for i, line in enumerate(lines, 1):
-            # Check for headers without blank line after
-            if i < len(lines) and line.startswith('#'):
-                next_line = lines[i] if i < len(lines) else ""
-                if next_line and not next_line.strip() == "" and not next_line.startswith('#'):
-                    issues.append({
-                        'line': i + 1,
-                        'type': 'warning',
-                        'message': f"Consider adding blank line after header at line {i}"
-                    })
-            
-            # Check for inconsistent heading levels (skip first few lines)
-            if line.startswith('#') and i > 3:
-                level = len(line) - len(line.lstrip('#'))
-                if level > 6:
-                    issues.append({
-                        'line': i,
-                        'type': 'error',
-                        'message': f"Invalid heading level {level} at line {i} (max is 6)"
-                    })
-            
-            # Check for broken links [text](url) format
-            link_pattern = r'\[([^\]]+)\]\(([^)]+)\)'
-            matches = re.finditer(link_pattern, line)
-            for match in matches:
-                url = match.group(2)
-                if url.strip() == "":
-                    issues.append({
-                        'line': i,
-                        'type': 'error',
-                        'message': f"Empty link URL at line {i}: {match.group(0)}"
-                    })
-            
-            # Check for images without alt text
-            img_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
-            img_matches = re.finditer(img_pattern, line)
-            for match in img_matches:
-                alt_text = match.group(1)
-                if not alt_text or alt_text.strip() == "":
-                    issues.append({
-                        'line': i,
-                        'type': 'warning',
-                        'message': f"Image without alt text at line {i} (accessibility issue)"
-                    })
-            
-            # Check for table formatting issues
-            if '|' in line and not line.strip().startswith('|'):
-                # Table row that doesn't start with |
-                if i > 1 and '|' in lines[i-2] if i > 1 else False:
-                    issues.append({
-                        'line': i,
-                        'type': 'warning',
-                        'message': f"Table row at line {i} should start with |"
-                    })
-        
-        # Check for missing blank lines around code blocks
-        in_code_block = False
-        for i, line in enumerate(lines, 1):
-            if line.strip().startswith('```'):
-                in_code_block = not in_code_block
-                if not in_code_block and i < len(lines):
-                    next_line = lines[i] if i < len(lines) else ""
-                    if next_line and not next_line.strip() == "":
-                        issues.append({
-                            'line': i + 1,
-                            'type': 'warning',
-                            'message': f"Consider adding blank line after code block at line {i}"
-                        })
+    def _store_lint_result(
+        self, editor_id: str, cache_entry: tuple, issues: list, counts: Counter
+    ) -> None:
+        """Store lint issues for an editor and summarize them in the status bar."""
+        self._lint_cache[editor_id] = cache_entry
         
         # Store issues
         self.lint_issues[editor_id] = issues
+        self._lint_counts[editor_id] = counts
+        
+        # Background results can arrive after switching tabs; only the
+        # active editor's lint belongs in the status bar
+        if editor_id != self._active_editor_id():
+            return
         
-        # Update status bar with lint info
+        # Update status bar with lint info; don't overwrite it if there are no issues
         if issues:
-            errors = sum(1 for issue in issues if issue['type'] == 'error')
-            warnings = sum(1 for issue in issues if issue['type'] == 'warning')
+            errors = counts[Severity.ERROR]
+            warnings = counts[Severity.WARNING]
             if errors > 0:
                 self._set_status(f"Lint: {errors} error(s), {warnings} warning(s) | Press Ctrl+L for details")
             else:
                 self._set_status(f"Lint: {warnings} warning(s) | Press Ctrl+L for details")
-        else:
-            # Only update if we're on this editor
-            current_editor = self._active_editor_id()
-            if current_editor == editor_id:
-                # Don't overwrite status if there are no issues
-                pass
 
     def _append_command_output(self, message: str) -> None:
         """Append message to command output area with syntax highlighting."""
         # Highlight keywords in the message
         highlighted_message = self._highlight_shell_keywords(message)
         
-        # Get current text from Static widget
-        current_text = ""
-        if hasattr(self.command_output, 'renderable'):
-            # Try to get text from renderable
-            try:
-                current_text = str(self.command_output.renderable)
-            except:
-                pass
-        
-        # If we can't get it from renderable, try to track it ourselves
-        if not hasattr(self, '_command_output_text'):
-            self._command_output_text = ""
+        # Append the highlighted message; the deque drops the oldest lines
+        self._command_output_lines.append(highlighted_message)
         
-        # Append the highlighted message
-        if self._command_output_text:
-            self._command_output_text = f"{self._command_output_text}\n{highlighted_message}"
-        else:
-            self._command_output_text = highlighted_message
-        
-        # Update the Static widget with the new text
-        self.command_output.update(self._command_output_text)
+        # Coalesce appends: update the Static widget at most once per refresh
+        if not self._command_output_dirty:
+            self._command_output_dirty = True
+            self.call_after_refresh(self._flush_command_output)
+
+    def _flush_command_output(self) -> None:
+        """Update the command output widget with the buffered lines."""
+        self._command_output_dirty = False
+        self.command_output.update("\n".join(self._command_output_lines))
 
-    def _execute_shell_command(self, command: str) -> None:
+    async def _execute_shell_command(self, command: str) -> None:
         """Execute a shell command and display output."""
         if not command.strip():
             return
@@ -845,23 +889,17 @@ $$
             target_dir = command_stripped[3:].strip()
             if not target_dir:
                 # cd without arguments goes to home, but we'll go to root_path
-                self.current_working_dir = self.root_path
+                self.current_working_dir = self._root_resolved
             elif target_dir == "..":
                 # Go up one directory, but don't go above root_path
-                parent = self.current_working_dir.parent
-                if parent.resolve() != self.root_path.resolve() and self.root_path.resolve() in parent.resolve().parents:
-                    self.current_working_dir = parent
-                elif parent.resolve() == self.root_path.resolve():
-                    self.current_working_dir = self.root_path
-                else:
-                    # Don't go above root_path
-                    self.current_working_dir = self.root_path
+                if self.current_working_dir != self._root_resolved:
+                    self.current_working_dir = self.current_working_dir.parent
             else:
                 # Change to specified directory
                 target_path = (self.current_working_dir / target_dir).resolve()
                 # Ensure we don't go outside root_path
-                if target_path.exists() and target_path.is_dir():
-                    if self.root_path.resolve() in target_path.resolve().parents or target_path.resolve() == self.root_path.resolve():
+                if target_path.is_dir():
+                    if os.path.commonpath([self._root_str, str(target_path)]) == self._root_str:
                         self.current_working_dir = target_path
                     else:
                         self._append_command_output(f"$ {command}")
@@ -880,49 +918,113 @@ $$
         # Show the command being executed
         self._append_command_output(f"$ {command}")
         
+        # Resolve targets now, before current_working_dir can change
+        touched_paths = self._paths_touched_by(command)
+        
         try:
-            # Use current_working_dir for commands
-            result = subprocess.run(
+            # Use current_working_dir for commands; run without blocking the UI
+            proc = await asyncio.create_subprocess_shell(
                 command,
-                shell=True,
                 cwd=str(self.current_working_dir),
-                capture_output=True,
-                text=True,
-                timeout=10
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
             )
+            try:
+                # Show output as it arrives instead of after the command exits
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        self._stream_command_output(proc.stdout),
+                        self._stream_command_output(proc.stderr, header="[stderr]"),
+                        proc.wait(),
+                    ),
+                    timeout=10,
+                )
+            except asyncio.TimeoutError:
+                self._append_command_output("[error]Command timed out after 10 seconds")
+                return
+            finally:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
             
-            if result.stdout:
-                self._append_command_output(result.stdout)
-            if result.stderr:
-                self._append_command_output(f"[stderr]\n{result.stderr}")
-            if result.returncode != 0:
-                self._append_command_output(f"[exit code: {result.returncode}]")
+            if proc.returncode != 0:
+                self._append_command_output(f"[exit code: {proc.returncode}]")
             else:
                 self._append_command_output("[success]")
             
             # Refresh file tree if command might have changed files
             if any(cmd in command.lower() for cmd in ['mkdir', 'touch', 'rm', 'mv', 'cp', 'create', 'delete', 'rename']):
-                # Refresh the entire tree by rebuilding root
-                self.file_tree.root.remove_children()
-                self._build_file_tree(self.root_path, self.file_tree.root)
+                if touched_paths is not None:
+                    # Only rebuild the directories the command touched
+                    self._refresh_file_tree_dirs(path.parent for path in touched_paths)
+                else:
+                    # Refresh the entire tree by rebuilding root
+                    self._clear_dir_node(self._root_resolved, self.file_tree.root)
+                    self._build_file_tree(self.root_path, self.file_tree.root)
                 
-        except subprocess.TimeoutExpired:
-            self._append_command_output("[error]Command timed out after 10 seconds")
         except Exception as e:
             self._append_command_output(f"[error]Failed to execute command: {e}")
 
-    def _current_editor_and_preview(self) -> tuple[TextArea | None, Markdown | None]:
+    async def _stream_command_output(
+        self, stream: asyncio.StreamReader, header: str | None = None
+    ) -> None:
+        """Append each line read from stream to the command output."""
+        # Read fixed-size chunks and split lines here: StreamReader's line
+        # reading fails on lines longer than its buffer limit. Only the first
+        # MAX_OUTPUT_LINE_BYTES of a line are kept, so memory stays bounded
+        parts: list[bytes] = []  # kept pieces of the current line
+        kept = 0
+        truncated = False
+
+        def add(piece: bytes) -> None:
+            nonlocal kept, truncated
+            room = self.MAX_OUTPUT_LINE_BYTES - kept
+            if len(piece) > room:
+                piece = piece[:room]
+                truncated = True
+            if piece:
+                parts.append(piece)
+                kept += len(piece)
+
+        def emit() -> None:
+            nonlocal header, kept, truncated
+            if header is not None:
+                # Shown once, before the first line
+                self._append_command_output(header)
+                header = None
+            line = b"".join(parts).decode(errors="replace").rstrip("\r")
+            if truncated:
+                line += " …[truncated]"
+            self._append_command_output(line)
+            parts.clear()
+            kept = 0
+            truncated = False
+
+        while True:
+            chunk = await stream.read(self.COMMAND_READ_SIZE)
+            if not chunk:
+                break
+            *complete, rest = chunk.split(b"\n")
+            for piece in complete:
+                add(piece)
+                emit()
+            add(rest)
+        if parts or truncated:
+            # Last line had no trailing newline
+            emit()
+
+    def _current_editor_and_preview(self) -> tuple[TextArea | None, MarkdownPreview | None]:
         """Return the active TextArea and Markdown, if any."""
         pane = self.tabs.active_pane
         if pane is None:
             return None, None
         editor = pane.query_one("TextArea")
-        preview = pane.query_one("Markdown")
+        preview = pane.query_one(MarkdownPreview)
         return editor, preview
 
     def _active_editor_id(self) -> str | None:
-        editor, _ = self._current_editor_and_preview()
-        return editor.id if editor else None
+        # Kept up to date as tabs are opened, activated and closed
+        return self._active_editor
 
     def _update_status_for_editor(self, editor_id: str | None) -> None:
         if editor_id is None:
@@ -931,43 +1033,38 @@ $$
 
         path = self.editor_files.get(editor_id)
         star = "*" if self.modified.get(editor_id, False) else ""
-        file_name = path.name if path else "untitled.md"
+        file_name = path.name if path else self._untitled_names.get(editor_id, "untitled.md")
         self._set_status(
             f"{file_name}{star}  |  Ctrl+N: New  Ctrl+O: Open  Ctrl+S: Save  Ctrl+W: Close tab  Ctrl+H: Help  Ctrl+L: Lint  Ctrl+Enter: Execute  Ctrl+Q: Quit"
         )
 
     # ---------- File / tab management ----------
 
-    def open_file(self, path: Path) -> None:
+    async def open_file(self, path: Path) -> None:
         """Open a file in a new tab, or focus if already open."""
         path = path.resolve()
 
         # Check if already open
-        for editor_id, p in self.editor_files.items():
-            if p == path:
-                # Focus that tab
-                for pane in self.tabs.query("TabPane"):
-                    editor = pane.query_one("TextArea")
-                    if editor.id == editor_id:
-                        self.tabs.active = pane.id
-                        self._update_status_for_editor(editor_id)
-                        self._append_command_output(f"Focused already-open file: {path}")
-                        return
+        if self._focus_open_file(path):
+            return
 
-        # Create new tab
+        # Create new tab; read off the event loop so large files don't block the UI
         try:
-            text = path.read_text(encoding="utf-8")
+            text = await asyncio.to_thread(path.read_text, encoding="utf-8")
         except Exception as e:
             self._append_command_output(f"[error]Failed to open {path}: {e}")
             self._set_status(f"Failed to open {path.name}")
             return
 
+        # The same file may have been opened while it was being read
+        if self._focus_open_file(path):
+            return
+
         # Warn if file is not a markdown file
         if path.suffix.lower() != ".md":
             self._append_command_output(f"[warning]Opened non-markdown file: {path.name} (extension: {path.suffix or 'none'})")
 
-        editor_id = f"editor_{len(self.editor_files) + 1}"
-        pane_id = f"pane_{len(self.editor_files) + 1}"
+        editor_id, pane_id = self._next_tab_ids()
 
         file_title = path.name
 
@@ -977,7 +1074,7 @@ $$
             language="markdown",
             classes="editor-text",
         )
-        preview = Markdown(text, classes="preview")
+        preview = MarkdownPreview(text, classes="preview")
         preview_scroll = VerticalScroll(preview, classes="preview")
 
         content = Horizontal(editor, preview_scroll, classes="editor-layout")
@@ -987,19 +1084,45 @@ $$
         self.tabs.active = pane.id
 
         self.editor_files[editor_id] = path
+        self.editor_panes[editor_id] = pane_id
+        self._pane_editors[pane_id] = editor_id
+        self._active_editor = editor_id
+        self._preview_by_editor[editor_id] = preview
+        self._path_to_editor[path] = editor_id
+        self._last_text[editor_id] = text
         self.modified[editor_id] = False
         self._update_status_for_editor(editor_id)
         self._append_command_output(f"Opened {path}")
 
-    def create_new_file(self) -> None:
+    def _next_tab_ids(self) -> tuple[str, str]:
+        """Return fresh (editor_id, pane_id) values that never repeat."""
+        self._tab_counter += 1
+        return f"editor_{self._tab_counter}", f"pane_{self._tab_counter}"
+
+    def _focus_open_file(self, path: Path) -> bool:
+        """Focus the tab for path if it is already open; return True if it was."""
+        editor_id = self._path_to_editor.get(path)
+        if editor_id is None:
+            return False
+        pane_id = self.editor_panes.get(editor_id)
+        if pane_id is None:
+            # Stale mapping for an editor without a tab of its own
+            self._path_to_editor.pop(path, None)
+            return False
+        self.tabs.active = pane_id
+        self._active_editor = editor_id
+        self._update_status_for_editor(editor_id)
+        self._append_command_output(f"Focused already-open file: {path}")
+        return True
+
+    async def create_new_file(self) -> None:
         """Create a new empty file in a new tab."""
-        editor_id = f"editor_{len(self.editor_files) + 1}"
-        pane_id = f"pane_{len(self.editor_files) + 1}"
+        editor_id, pane_id = self._next_tab_ids()
 
         # Generate a unique untitled filename
-        untitled_count = sum(1 for p in self.editor_files.values() if p and p.name.startswith("untitled"))
-        if untitled_count > 0:
-            file_title = f"untitled{untitled_count + 1}.md"
+        self._untitled_counter += 1
+        if self._untitled_counter > 1:
+            file_title = f"untitled{self._untitled_counter}.md"
         else:
             file_title = "untitled.md"
 
@@ -1009,23 +1132,33 @@ $$
             language="markdown",
             classes="editor-text",
         )
-        preview = Markdown("", classes="preview")
+        preview = MarkdownPreview("", classes="preview")
         preview_scroll = VerticalScroll(preview, classes="preview")
 
         content = Horizontal(editor, preview_scroll, classes="editor-layout")
 
         pane = TabPane(file_title, content, id=pane_id)
-        self.tabs.add_pane(pane)
-        self.tabs.active = pane.id
 
-        # New file has no path yet (will be set on first save)
+        # New file has no path yet (will be set on first save). Registered
+        # before mounting so the tab activation event finds the editor
         self.editor_files[editor_id] = None
+        self.editor_panes[editor_id] = pane_id
+        self._pane_editors[pane_id] = editor_id
+        self._untitled_names[editor_id] = file_title
+        self._preview_by_editor[editor_id] = preview
+        self._last_text[editor_id] = ""
         self.modified[editor_id] = True  # New file is considered modified
+        # An empty document has nothing to lint
+        self.lint_issues[editor_id] = []
+
+        # Mount and activate the new tab in a single layout pass
+        with self.batch_update():
+            await self.tabs.add_pane(pane)
+            self.tabs.active = pane.id
+
+        self._active_editor = editor_id
         self._update_status_for_editor(editor_id)
         self._append_command_output(f"Created new file: {file_title}")
-        
-        # Run initial linting
-        self._lint_markdown(editor_id, "")
 
     def save_current(self) -> None:
         editor, preview = self._current_editor_and_preview()
@@ -1034,45 +1167,113 @@ $$
             return
 
         editor_id = editor.id
+        if editor_id not in self.editor_panes:
+            # e.g. the read-only Markdown reference tab
+            self._set_status("This tab can't be saved.")
+            return
         path = self.editor_files.get(editor_id)
 
         if path is None:
-            path = Path("untitled.md").resolve()
+            # Save under the tab's name; cwd is already absolute, so there is
+            # no need to resolve() through the filesystem
+            path = Path.cwd() / self._untitled_names.get(editor_id, "untitled.md")
+            if path in self._path_to_editor:
+                self._set_status(f"{path.name} is already open in another tab.")
+                return
+            self._untitled_names.pop(editor_id, None)
             self.editor_files[editor_id] = path
+            self._path_to_editor[path] = editor_id
+
+        # Write on a worker thread so slow disks don't block typing
+        text = editor.text
+        generation = self._save_generation.get(path, 0) + 1
+        self._save_generation[path] = generation
+        self.run_worker(
+            partial(self._write_file, editor, path, text, generation),
+            thread=True,
+            group="save",
+        )
 
-        try:
-            path.write_text(editor.text, encoding="utf-8")
-        except Exception as e:
-            self._append_command_output(f"[error]Failed to save {path}: {e}")
-            self._set_status(f"Failed to save {path.name}")
-            return
-
-        self.modified[editor_id] = False
+    def _write_file(self, editor: TextArea, path: Path, text: str, generation: int) -> None:
+        """Write an editor's text to disk (runs on a worker thread)."""
+        with self._save_lock:
+            # A newer save of the same file was requested; let that one write
+            if self._save_generation.get(path) != generation:
+                return
+            tmp_path = None
+            try:
+                if path.exists():
+                    # Write a uniquely named sibling and swap it in, so a failed
+                    # write never leaves the original truncated; keep its mode
+                    fd, tmp_name = tempfile.mkstemp(
+                        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+                    )
+                    tmp_path = Path(tmp_name)
+                    with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                        tmp_file.write(text)
+                    shutil.copymode(path, tmp_path)
+                    os.replace(tmp_path, path)
+                else:
+                    # Nothing to protect; a plain write gets the usual permissions
+                    path.write_text(text, encoding="utf-8")
+            except Exception as e:
+                if tmp_path is not None:
+                    tmp_path.unlink(missing_ok=True)
+                self.call_from_thread(self._on_save_failed, path, e)
+                return
+        self.call_from_thread(self._on_save_done, editor, path, text)
+
+    def _on_save_done(self, editor: TextArea, path: Path, text: str) -> None:
+        editor_id = editor.id
+        # Still modified if the user kept typing while the file was written.
+        # Compare against the text seen by the last change event rather than
+        # rebuilding editor.text; an edit not yet seen marks the tab modified
+        # again when its event arrives
+        if editor_id in self.modified and self._last_text.get(editor_id) == text:
+            self.modified[editor_id] = False
         self._update_status_for_editor(editor_id)
         self._append_command_output(f"Saved {path}")
         
         # Refresh file tree to show the new/updated file
         self._refresh_file_tree_for_path(path)
 
+    def _on_save_failed(self, path: Path, error: Exception) -> None:
+        self._append_command_output(f"[error]Failed to save {path}: {error}")
+        self._set_status(f"Failed to save {path.name}")
+
     def close_current_tab(self) -> None:
         """Close the active tab."""
-        editor, _ = self._current_editor_and_preview()
-        if not editor:
+        pane = self.tabs.active_pane
+        if pane is None:
             return
-        editor_id = editor.id
+        editor_id = self._pane_editors.pop(pane.id, None)
 
         # Remove pane
-        pane = self.tabs.active_pane
-        if pane:
-            self.tabs.remove_pane(pane.id)
-            self._append_command_output(f"Closed tab for {self.editor_files.get(editor_id, 'unknown')}")
+        self.tabs.remove_pane(pane.id)
+        if pane.id == "markdown_reference_pane":
+            self._reference_pane_exists = False
+        self._append_command_output(f"Closed tab for {self.editor_files.get(editor_id, 'unknown')}")
 
         # Cleanup maps
-        self.editor_files.pop(editor_id, None)
+        path = self.editor_files.pop(editor_id, None)
+        if path is not None:
+            self._path_to_editor.pop(path, None)
+        self.editor_panes.pop(editor_id, None)
+        self._untitled_names.pop(editor_id, None)
+        self._preview_by_editor.pop(editor_id, None)
+        self._last_text.pop(editor_id, None)
         self.modified.pop(editor_id, None)
-
-        # Update status
-        self._update_status_for_editor(self._active_editor_id())
+        self._lint_cache.pop(editor_id, None)
+        self._lint_generation.pop(editor_id, None)
+        self._lint_counts.pop(editor_id, None)
+        timer = self._preview_timers.pop(editor_id, None)
+        if timer is not None:
+            timer.stop()
+        self._preview_pending_since.pop(editor_id, None)
+
+        # The next tab's activation event sets the new active editor
+        self._active_editor = None
+        self._update_status_for_editor(None)
 
     # ---------- Actions (keybindings) ----------
 
@@ -1085,13 +1286,13 @@ $$
 
         path = node.data
         if isinstance(path, Path) and path.is_file():
-            self.open_file(path)
+            self.run_worker(self.open_file(path), exclusive=False)
         else:
             node.expand()
             self._set_status("Expanded folder.")
 
-    def action_new_file(self) -> None:
-        self.create_new_file()
+    async def action_new_file(self) -> None:
+        await self.create_new_file()
 
     def action_save(self) -> None:
         self.save_current()
@@ -1103,29 +1304,16 @@ $$
         """Execute the command in the command input."""
         command = self.command_input.value
         if command.strip():
-            self._execute_shell_command(command)
+            # Run as a worker so long-running commands don't freeze the UI
+            self.run_worker(self._execute_shell_command(command), exclusive=False)
             self.command_input.value = ""  # Clear input after execution
 
     def action_show_markdown_reference(self) -> None:
         """Show or recreate the Markdown reference tab."""
-        # Check if the reference tab already exists
-        reference_pane = None
-        for pane in self.tabs.query("TabPane"):
-            if pane.id == "markdown_reference_pane":
-                reference_pane = pane
-                break
-        
-        if reference_pane:
-            # Tab exists, just switch to it
-            self.tabs.active = reference_pane.id
-        else:
-            # Tab doesn't exist, recreate it
+        if not self._reference_pane_exists:
+            # Tab doesn't exist yet (or was closed), create it
             self._create_markdown_reference_tab()
-            # Switch to the newly created tab
-            for pane in self.tabs.query("TabPane"):
-                if pane.id == "markdown_reference_pane":
-                    self.tabs.active = pane.id
-                    break
+        self.tabs.active = "markdown_reference_pane"
 
     def action_show_lint_issues(self) -> None:
         """Show lint issues for the current editor."""
@@ -1140,23 +1328,23 @@ $$
             self._set_status("Lint: No issues found")
             return
         
+        counts = self._lint_counts.get(editor_id, Counter())
+        
         # Show issues in command output
-        self._append_command_output(f"[lint] Found {len(issues)} issue(s):")
+        total = counts.total()
+        self._append_command_output(f"[lint] Found {total} issue(s):")
         for issue in issues[:10]:  # Show first 10 issues
-            issue_type = issue['type'].upper()
-            line_num = issue['line']
-            message = issue['message']
-            if issue_type == 'ERROR':
-                self._append_command_output(f"[error]Line {line_num}: {message}")
+            if issue.type == Severity.ERROR:
+                self._append_command_output(f"[error]Line {issue.line}: {issue.message}")
             else:
-                self._append_command_output(f"[warning]Line {line_num}: {message}")
+                self._append_command_output(f"[warning]Line {issue.line}: {issue.message}")
         
-        if len(issues) > 10:
-            self._append_command_output(f"[lint] ... and {len(issues) - 10} more issue(s)")
+        if total > 10:
+            self._append_command_output(f"[lint] ... and {total - 10} more issue(s)")
         
-        errors = sum(1 for issue in issues if issue['type'] == 'error')
-        warnings = sum(1 for issue in issues if issue['type'] == 'warning')
-        self._set_status(f"Lint: {errors} error(s), {warnings} warning(s) | See command output")
+        self._set_status(
+            f"Lint: {counts[Severity.ERROR]} error(s), {counts[Severity.WARNING]} warning(s) | See command output"
+        )
 
     def action_quit(self) -> None:
         self.exit()
@@ -1168,10 +1356,21 @@ $$
         node = event.node
         path = getattr(node, "data", None)
         if isinstance(path, Path) and path.is_file():
-            self.open_file(path)
+            self.run_worker(self.open_file(path), exclusive=False)
         else:
             node.expand()
 
+    def on_tree_node_expanded(self, event: Tree.NodeExpanded) -> None:
+        """Populate a directory node the first time it is expanded."""
+        node = event.node
+        path = getattr(node, "data", None)
+        if not isinstance(path, Path):
+            return
+        children = node.children
+        if len(children) == 1 and children[0].data is None:
+            node.remove_children()
+            self._build_file_tree(path, node)
+
     def on_text_area_changed(self, event: TextArea.Changed) -> None:
         """Update modified flag and live preview on text change."""
         editor = event.text_area
@@ -1181,24 +1380,56 @@ $$
             # Might be some other TextArea; ignore
             return
 
+        # Skip events that didn't actually change the content
+        text = editor.text
+        if self._last_text.get(editor_id) == text:
+            return
+        self._last_text[editor_id] = text
+
         self.modified[editor_id] = True
         self._update_status_for_editor(editor_id)
 
         # Update preview for this pane
-        pane = self.tabs.active_pane
-        if not pane:
+        preview = self._preview_by_editor.get(editor_id)
+        if preview is None:
             return
-        preview = pane.query_one("Markdown")
-        preview.update(editor.text)
+
+        # Debounce preview + lint: a burst of keystrokes only re-renders once,
+        # but continuous typing still refreshes every PREVIEW_MAX_DELAY seconds
+        timer = self._preview_timers.pop(editor_id, None)
+        if timer is not None:
+            timer.stop()
+        now = time.monotonic()
+        pending_since = self._preview_pending_since.setdefault(editor_id, now)
+        # Every change event reschedules with its own text, so the text
+        # captured here is the latest when the timer fires
+        if now - pending_since >= self.PREVIEW_MAX_DELAY:
+            self._update_preview_and_lint(editor_id, preview, text)
+        else:
+            self._preview_timers[editor_id] = self.set_timer(
+                self.PREVIEW_DEBOUNCE,
+                partial(self._update_preview_and_lint, editor_id, preview, text),
+            )
+
+    def _update_preview_and_lint(
+        self, editor_id: str, preview: MarkdownPreview, text: str
+    ) -> None:
+        """Render the preview and lint the given editor text."""
+        self._preview_timers.pop(editor_id, None)
+        self._preview_pending_since.pop(editor_id, None)
+        preview.update(text)
         
-        # Run linting on markdown content
-        self._lint_markdown(editor_id, editor.text)
+        # Run linting on markdown content off the UI thread
+        self._lint_markdown_in_background(editor_id, text)
 
     def on_tabbed_content_tab_activated(
         self, event: TabbedContent.TabActivated
     ) -> None:
         """Update status when switching tabs."""
-        self._update_status_for_editor(self._active_editor_id())
+        editor_id = self._pane_editors.get(event.pane.id)
+        # Only file tabs count as an active editor, not the reference tab
+        self._active_editor = editor_id if editor_id in self.editor_panes else None
+        self._update_status_for_editor(self._active_editor)
 
     def on_input_submitted(self, event: Input.Submitted) -> None:
         """Handle command input submission."""